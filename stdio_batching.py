@@ -0,0 +1,61 @@
+"""
+Batched stdio transport shared by the Wealth Management MCP servers
+"""
+
+import contextlib
+import sys
+from io import TextIOWrapper
+
+import anyio
+import anyio.lowlevel
+
+from mcp.shared.message import SessionMessage
+from mcp.types import JSONRPCMessage
+
+
+@contextlib.asynccontextmanager
+async def batched_stdio_server(max_batch: int = 32):
+    """stdio transport like mcp.server.stdio.stdio_server, except the writer
+    drains every message already queued (up to max_batch) and sends them with
+    a single write + flush instead of one flush per message"""
+    stdin = anyio.wrap_file(TextIOWrapper(sys.stdin.buffer, encoding="utf-8"))
+    stdout = anyio.wrap_file(TextIOWrapper(sys.stdout.buffer, encoding="utf-8"))
+    
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(max_batch)
+    
+    async def stdin_reader():
+        try:
+            async with read_stream_writer:
+                async for line in stdin:
+                    try:
+                        message = JSONRPCMessage.model_validate_json(line)
+                    except Exception as exc:
+                        await read_stream_writer.send(exc)
+                        continue
+                    await read_stream_writer.send(SessionMessage(message))
+        except anyio.ClosedResourceError:
+            await anyio.lowlevel.checkpoint()
+    
+    async def stdout_writer():
+        try:
+            async with write_stream_reader:
+                async for session_message in write_stream_reader:
+                    batch = [session_message]
+                    while len(batch) < max_batch:
+                        try:
+                            batch.append(write_stream_reader.receive_nowait())
+                        except (anyio.WouldBlock, anyio.EndOfStream):
+                            break
+                    await stdout.write("".join(
+                        m.message.model_dump_json(by_alias=True, exclude_none=True) + "\n"
+                        for m in batch
+                    ))
+                    await stdout.flush()
+        except anyio.ClosedResourceError:
+            await anyio.lowlevel.checkpoint()
+    
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(stdin_reader)
+        tg.start_soon(stdout_writer)
+        yield read_stream, write_stream
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Wealth Management MCP Server - stdio EOF check
+Pipes a burst of requests into each server, closes stdin and checks that every
+request was answered before the process exited cleanly
+
+Usage:
+1. Run this script: python test_stdio_eof.py
+2. Or collect it with pytest: pytest test_stdio_eof.py
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent
+_SERVERS = ("wealth_management_server.py", "wealth_management_server_4.py")
+
+# Enough concurrent tool calls to fill the batched writer, with a cache miss
+# (the only get_clients call) as the very last request before EOF
+_REQUESTS = [
+    {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+        "protocolVersion": "2024-11-05", "capabilities": {},
+        "clientInfo": {"name": "eof-check", "version": "1.0"}}},
+    {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+] + [
+    {"jsonrpc": "2.0", "id": 3 + i, "method": "tools/call", "params": {
+        "name": "get_client_positions",
+        "arguments": {"client_id": f"BZ-{i % 20 + 1:05d}", "min_weight": i / 100}}}
+    for i in range(40)
+] + [
+    {"jsonrpc": "2.0", "id": 99, "method": "tools/call", "params": {
+        "name": "get_clients", "arguments": {"sort_by": "total_aum"}}},
+]
+_EXPECTED_IDS = {r["id"] for r in _REQUESTS if "id" in r}
+
+
+def check_server(script: str) -> list[str]:
+    """Run one server over piped stdin and return the problems found"""
+    stdin = "".join(json.dumps(r) + "\n" for r in _REQUESTS)
+    proc = subprocess.run(
+        [sys.executable, str(_HERE / script)],
+        input=stdin, capture_output=True, text=True, timeout=60, cwd=_HERE
+    )
+    answered = {json.loads(line).get("id") for line in proc.stdout.splitlines() if line.strip()}
+
+    problems = []
+    missing = sorted(_EXPECTED_IDS - answered)
+    if missing:
+        problems.append(f"{script}: no reply for ids {missing}")
+    if proc.returncode != 0:
+        problems.append(f"{script}: exited with rc {proc.returncode}")
+    return problems
+
+
+def test_all_replies_sent_before_eof_exit():
+    for script in _SERVERS:
+        assert check_server(script) == []
+
+
+if __name__ == "__main__":
+    problems = [p for script in _SERVERS for p in check_server(script)]
+    for problem in problems:
+        print(problem)
+    print("FAILED" if problems else f"OK: every request answered and a clean exit for {len(_SERVERS)} servers")
+    sys.exit(1 if problems else 0)
@@ -10,29 +10,213 @@ Phase 3: Tool 3 - Recommendations Tool
 """
 
 import asyncio
+from collections import OrderedDict
+import dataclasses
+import functools
+import hashlib
+import itertools
 import json
 import logging
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import random
+import textwrap
 
 # MCP imports
 from mcp.server import Server, NotificationOptions
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.models import InitializationOptions
-from mcp.server.stdio import stdio_server
 from mcp.types import (
     Resource,
     Tool,
     TextContent,
     ImageContent,
     EmbeddedResource,
+    ResourceLink,
     LoggingLevel
 )
 from pydantic import AnyUrl
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from stdio_batching import batched_stdio_server
+
+# Logging is configured by whoever runs the server (see __main__ below);
+# importing the module leaves the root logger alone
 logger = logging.getLogger("wealth-management-mcp-server")
+logger.addHandler(logging.NullHandler())
+
+# Optional faster JSON serializer (pip install orjson), stdlib json otherwise
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2, default=dataclasses.asdict)
+
+
+@functools.lru_cache(maxsize=256)
+def _err_text(message: str) -> str:
+    return json.dumps({"status": "error", "message": message})
+
+
+def _err(message: str) -> list[TextContent]:
+    """Build the standard error response returned by the tool handlers"""
+    return [TextContent(type="text", text=_err_text(message))]
+
+
+# Position records. Field order is the JSON key order (orjson serializes
+# dataclasses natively, the stdlib fallback goes through asdict); `value` is
+# the market value used for the summary totals
+@dataclasses.dataclass(slots=True, frozen=True, kw_only=True)
+class EquityPosition:
+    position_id: str
+    asset_type: str = "equity"
+    name: str
+    isin: str
+    sector: str
+    shares: int
+    price_per_share: float
+    market_value: float
+    weight: float
+    currency: str = "USD"
+
+    @property
+    def value(self) -> float:
+        return self.market_value
+
+
+@dataclasses.dataclass(slots=True, frozen=True, kw_only=True)
+class BondPosition:
+    position_id: str
+    asset_type: str = "bond"
+    name: str
+    isin: str
+    type: str
+    nominal_value: float
+    price_percentage: float
+    market_value: float
+    weight: float
+    currency: str = "USD"
+    coupon_rate: float
+    maturity_date: str
+
+    @property
+    def value(self) -> float:
+        return self.market_value
+
+
+@dataclasses.dataclass(slots=True, frozen=True, kw_only=True)
+class CashPosition:
+    position_id: str
+    asset_type: str = "cash"
+    name: str = "Cash Position"
+    isin: Optional[str] = None
+    amount: float
+    weight: float
+    currency: str = "USD"
+    account_type: str = "Money Market"
+
+    @property
+    def value(self) -> float:
+        return self.amount
+
+
+Position = EquityPosition | BondPosition | CashPosition
+
+
+_EMPTY_RESOURCES: list[Resource] = []
+
+# (positions, weights, values, summary) for an asset_type with no positions
+_EMPTY_POSITION_GROUP = ([], [], [], {
+    "total_positions": 0,
+    "total_value": 0,
+    "equity_positions": 0,
+    "bond_positions": 0,
+    "cash_positions": 0
+})
+
+# Tool definitions are static, so list_tools hands out the same list every time
+_TOOLS: list[Tool] = [
+    Tool(
+        name="get_clients",
+        description="Retrieve list of all clients managed by the advisor. Returns comprehensive client information including IDs, names, risk profiles, and AUM.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filter_by": {
+                    "type": "string",
+                    "description": "Optional filter criteria: 'active', 'under_review', 'high_aum' (>10M), 'new_clients' (last 90 days)",
+                    "enum": ["active", "under_review", "high_aum", "new_clients", "all"]
+                },
+                "sort_by": {
+                    "type": "string",
+                    "description": "Sort criteria for client list",
+                    "enum": ["name", "client_id", "total_aum", "onboarding_date", "last_review"]
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of clients to return (default: all)",
+                    "minimum": 1,
+                    "maximum": 100
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="get_client_positions",
+        description="Retrieve detailed position information for a specific client. Returns equities, bonds, and cash positions with valuations, weights, and metadata.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "client_id": {
+                    "type": "string",
+                    "description": "Client identifier in format BZ-xxxxx",
+                    "pattern": "^BZ-[0-9]{5}$"
+                },
+                "asset_type": {
+                    "type": "string",
+                    "description": "Filter by asset type (optional)",
+                    "enum": ["equity", "bond", "cash", "all"]
+                },
+                "min_weight": {
+                    "type": "number",
+                    "description": "Minimum position weight threshold (optional)",
+                    "minimum": 0,
+                    "maximum": 1
+                }
+            },
+            "required": ["client_id"]
+        }
+    ),
+    Tool(
+        name="get_recommendations", 
+        description="Get investment recommendations (BUY/SELL/NEUTRAL) for specific ISINs or all available securities. Provides analyst ratings, target prices, and rationale.",
+        inputSchema={
+            "type": "object", 
+            "properties": {
+                "isins": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of ISINs to get recommendations for. If empty, returns all available recommendations."
+                },
+                "rating_filter": {
+                    "type": "string",
+                    "enum": ["BUY", "SELL", "NEUTRAL", "all"],
+                    "description": "Filter recommendations by rating (optional)"
+                },
+                "asset_type": {
+                    "type": "string", 
+                    "enum": ["equity", "bond", "all"],
+                    "description": "Filter by asset type (optional)"
+                }
+            },
+            "required": []
+        }
+    )
+]
 
 
 class WealthManagementServer:
@@ -85,10 +269,62 @@ class WealthManagementServer:
         "US717081103": {"name": "Pfizer Corporate Bond", "type": "bond", "maturity": "2033-03-15", "currency": "USD"}
     }
 
+    # Recommendations are listed BUY > NEUTRAL > SELL
+    RATING_PRIORITY = {"BUY": 3, "NEUTRAL": 2, "SELL": 1}
+    
+    # Seed for the sample data generator - keeps restarts reproducible
+    SAMPLE_DATA_SEED = 42
+    
+    # seed -> (clients_data, positions_data), shared by all instances in the
+    # process since the tools never mutate the sample data
+    _SAMPLE_DATA_CACHE: Dict[int, tuple] = {}
+    
+    # Responses larger than this (in characters) are returned as a short
+    # preview (counts plus the first PREVIEW_ITEMS entries) and a link to a
+    # memory:// resource holding the full JSON
+    INLINE_RESPONSE_LIMIT = 64 * 1024
+    PREVIEW_ITEMS = 3
+    REFCACHE_SIZE = 64
+    
+    # Upper bound on tool calls executing at the same time
+    MAX_CONCURRENT_TOOL_CALLS = 32
+    
+    # Serialized responses kept per renderer (least recently used evicted first)
+    RESPONSE_CACHE_SIZES = {
+        "_render_clients": 128,
+        "_render_client_positions": 256,
+        "_render_recommendations": 256,
+    }
+
     def __init__(self):
         self.server = Server("wealth-management-mcp-server")
-        self.clients_data = self._generate_sample_clients()
-        self.positions_data = self._generate_sample_positions()
+        self._rng = random.Random(self.SAMPLE_DATA_SEED)
+        cached = self._SAMPLE_DATA_CACHE.get(self.SAMPLE_DATA_SEED)
+        if cached is None:
+            self.clients_data = self._generate_sample_clients()
+            self.positions_data = self._generate_sample_positions()
+            self._SAMPLE_DATA_CACHE[self.SAMPLE_DATA_SEED] = (self.clients_data, self.positions_data)
+        else:
+            self.clients_data, self.positions_data = cached
+        
+        # Lookup structures over the (immutable) sample data
+        self._client_index = {c["client_id"]: c for c in self.clients_data}
+        self._build_views()
+        self._build_recommendation_index()
+        
+        # Sample data never mutates, so finished responses can be reused:
+        # renderer name -> LRU of typed args -> (tool result content, full body
+        # if that content links to it), only touched on the event loop (see
+        # _render); clear these if a mutating tool is ever added
+        self._response_caches: Dict[str, OrderedDict] = {name: OrderedDict() for name in self.RESPONSE_CACHE_SIZES}
+        
+        # Oversized response bodies by content hash, served via read_resource
+        self._refcache: Dict[str, str] = {}
+        
+        # The MCP server runs every incoming request in its own task; this caps
+        # how many tool handlers are in flight so a burst of slow (I/O-bound)
+        # calls can't pile up without limit
+        self._tool_slots = asyncio.Semaphore(self.MAX_CONCURRENT_TOOL_CALLS)
         
         # Register tools
         self._register_tools()
@@ -112,8 +348,19 @@ class WealthManagementServer:
         
         client_types = ["Individual", "Corporate", "Trust", "Foundation"]
         risk_profiles = ["Conservative", "Moderate", "Aggressive", "Very Aggressive"]
+        investor_styles = ["Active trader", "Long-term investor", "Income focused", "Growth oriented"]
+        statuses = ["Active", "Active", "Active", "Under Review"]  # Mostly active
+        
+        # Draw the categorical columns for all clients up front
+        rng = self._rng
+        now = datetime.now()
+        num_clients = 20  # Generate 20 sample clients
+        client_type_column = rng.choices(client_types, k=num_clients)
+        risk_profile_column = rng.choices(risk_profiles, k=num_clients)
+        investor_style_column = rng.choices(investor_styles, k=num_clients)
+        status_column = rng.choices(statuses, k=num_clients)
         
-        for i in range(20):  # Generate 20 sample clients
+        for i in range(num_clients):
             client_id = f"BZ-{str(i+1).zfill(5)}"  # BZ-00001, BZ-00002, etc.
             
             # Random client data
@@ -122,14 +369,14 @@ class WealthManagementServer:
             client = {
                 "client_id": client_id,
                 "name": name,
-                "client_type": random.choice(client_types),
-                "risk_profile": random.choice(risk_profiles),
-                "onboarding_date": (datetime.now() - timedelta(days=random.randint(30, 1095))).strftime("%Y-%m-%d"),
-                "total_aum": round(random.uniform(100000, 50000000), 2),  # Assets Under Management
+                "client_type": client_type_column[i],
+                "risk_profile": risk_profile_column[i],
+                "onboarding_date": (now - timedelta(days=rng.randint(30, 1095))).strftime("%Y-%m-%d"),
+                "total_aum": round(rng.uniform(100000, 50000000), 2),  # Assets Under Management
                 "currency": "USD",
-                "advisor_notes": f"Client since {2020 + random.randint(0, 4)}. {random.choice(['Active trader', 'Long-term investor', 'Income focused', 'Growth oriented'])}.",
-                "last_review": (datetime.now() - timedelta(days=random.randint(1, 90))).strftime("%Y-%m-%d"),
-                "status": random.choice(["Active", "Active", "Active", "Under Review"])  # Mostly active
+                "advisor_notes": f"Client since {2020 + rng.randint(0, 4)}. {investor_style_column[i]}.",
+                "last_review": (now - timedelta(days=rng.randint(1, 90))).strftime("%Y-%m-%d"),
+                "status": status_column[i]
             }
             
             clients.append(client)
@@ -137,7 +384,7 @@ class WealthManagementServer:
         return clients
 
 
-    def _generate_sample_positions(self) -> Dict[str, List[Dict[str, Any]]]:
+    def _generate_sample_positions(self) -> Dict[str, List[Position]]:
         """Generate sample position data for all clients"""
         positions = {}
         
@@ -166,96 +413,97 @@ class WealthManagementServer:
             {"name": "Inflation Protected Securities", "isin": "US4642875433", "type": "TIPS"}
         ]
         
+        rng = self._rng
+        now = datetime.now()
+        
         # Generate positions for each client
         for client in self.clients_data:
             client_id = client["client_id"]
+            total_aum = client["total_aum"]
             client_positions = []
             
             # Determine number of positions based on AUM
-            if client["total_aum"] > 10000000:  # High AUM clients
-                num_positions = random.randint(7, 10)
-            elif client["total_aum"] > 1000000:  # Medium AUM clients
-                num_positions = random.randint(5, 8)
+            if total_aum > 10000000:  # High AUM clients
+                num_positions = rng.randint(7, 10)
+            elif total_aum > 1000000:  # Medium AUM clients
+                num_positions = rng.randint(5, 8)
             else:  # Lower AUM clients
-                num_positions = random.randint(3, 6)
+                num_positions = rng.randint(3, 6)
             
             total_allocated = 0
             
             # Add equity positions (40-70% of portfolio)
-            equity_allocation = random.uniform(0.4, 0.7)
-            num_equities = min(random.randint(2, 5), len(equities))
-            selected_equities = random.sample(equities, num_equities)
+            equity_allocation = rng.uniform(0.4, 0.7)
+            num_equities = min(rng.randint(2, 5), len(equities))
+            selected_equities = rng.sample(equities, num_equities)
+            equity_weight = 0  # running sum of the rounded equity weights
             
             for i, equity in enumerate(selected_equities):
                 if i == len(selected_equities) - 1:  # Last equity gets remaining allocation
-                    position_weight = equity_allocation - sum(pos["weight"] for pos in client_positions if pos["asset_type"] == "equity")
+                    position_weight = equity_allocation - equity_weight
                 else:
-                    position_weight = equity_allocation / num_equities * random.uniform(0.7, 1.3)
+                    position_weight = equity_allocation / num_equities * rng.uniform(0.7, 1.3)
                 
-                position_value = client["total_aum"] * position_weight
-                share_price = random.uniform(50, 500)
+                position_value = total_aum * position_weight
+                share_price = rng.uniform(50, 500)
                 shares = int(position_value / share_price)
                 actual_value = shares * share_price
+                weight = round(actual_value / total_aum, 4)
                 
-                client_positions.append({
-                    "position_id": f"POS-{client_id}-{len(client_positions)+1:03d}",
-                    "asset_type": "equity",
-                    "name": equity["name"],
-                    "isin": equity["isin"],
-                    "sector": equity["sector"],
-                    "shares": shares,
-                    "price_per_share": round(share_price, 2),
-                    "market_value": round(actual_value, 2),
-                    "weight": round(actual_value / client["total_aum"], 4),
-                    "currency": "USD"
-                })
+                client_positions.append(EquityPosition(
+                    position_id=f"POS-{client_id}-{len(client_positions)+1:03d}",
+                    name=equity["name"],
+                    isin=equity["isin"],
+                    sector=equity["sector"],
+                    shares=shares,
+                    price_per_share=round(share_price, 2),
+                    market_value=round(actual_value, 2),
+                    weight=weight
+                ))
+                equity_weight += weight
                 total_allocated += actual_value
             
             # Add bond positions (20-40% of portfolio)
-            bond_allocation = random.uniform(0.2, 0.4)
-            num_bonds = min(random.randint(1, 3), len(bonds))
-            selected_bonds = random.sample(bonds, num_bonds)
+            bond_allocation = rng.uniform(0.2, 0.4)
+            num_bonds = min(rng.randint(1, 3), len(bonds))
+            selected_bonds = rng.sample(bonds, num_bonds)
+            bond_weight = 0  # running sum of the rounded bond weights
             
             for i, bond in enumerate(selected_bonds):
                 if i == len(selected_bonds) - 1:  # Last bond gets remaining allocation
-                    position_weight = bond_allocation - sum(pos["weight"] for pos in client_positions if pos["asset_type"] == "bond")
+                    position_weight = bond_allocation - bond_weight
                 else:
-                    position_weight = bond_allocation / num_bonds * random.uniform(0.8, 1.2)
+                    position_weight = bond_allocation / num_bonds * rng.uniform(0.8, 1.2)
                 
-                position_value = client["total_aum"] * position_weight
-                bond_price = random.uniform(95, 105)  # Bond price as percentage of par
+                position_value = total_aum * position_weight
+                bond_price = rng.uniform(95, 105)  # Bond price as percentage of par
                 nominal_value = position_value / (bond_price / 100)
                 actual_value = nominal_value * (bond_price / 100)
+                weight = round(actual_value / total_aum, 4)
                 
-                client_positions.append({
-                    "position_id": f"POS-{client_id}-{len(client_positions)+1:03d}",
-                    "asset_type": "bond",
-                    "name": bond["name"],
-                    "isin": bond["isin"],
-                    "type": bond["type"],
-                    "nominal_value": round(nominal_value, 2),
-                    "price_percentage": round(bond_price, 2),
-                    "market_value": round(actual_value, 2),
-                    "weight": round(actual_value / client["total_aum"], 4),
-                    "currency": "USD",
-                    "coupon_rate": round(random.uniform(2.0, 6.0), 2),
-                    "maturity_date": (datetime.now() + timedelta(days=random.randint(365, 3650))).strftime("%Y-%m-%d")
-                })
+                client_positions.append(BondPosition(
+                    position_id=f"POS-{client_id}-{len(client_positions)+1:03d}",
+                    name=bond["name"],
+                    isin=bond["isin"],
+                    type=bond["type"],
+                    nominal_value=round(nominal_value, 2),
+                    price_percentage=round(bond_price, 2),
+                    market_value=round(actual_value, 2),
+                    weight=weight,
+                    coupon_rate=round(rng.uniform(2.0, 6.0), 2),
+                    maturity_date=(now + timedelta(days=rng.randint(365, 3650))).strftime("%Y-%m-%d")
+                ))
+                bond_weight += weight
                 total_allocated += actual_value
             
             # Add cash position (remaining allocation)
-            cash_value = client["total_aum"] - total_allocated
+            cash_value = total_aum - total_allocated
             if cash_value > 0:
-                client_positions.append({
-                    "position_id": f"POS-{client_id}-{len(client_positions)+1:03d}",
-                    "asset_type": "cash",
-                    "name": "Cash Position",
-                    "isin": None,
-                    "amount": round(cash_value, 2),
-                    "weight": round(cash_value / client["total_aum"], 4),
-                    "currency": "USD",
-                    "account_type": "Money Market"
-                })
+                client_positions.append(CashPosition(
+                    position_id=f"POS-{client_id}-{len(client_positions)+1:03d}",
+                    amount=round(cash_value, 2),
+                    weight=round(cash_value / total_aum, 4)
+                ))
             
             positions[client_id] = client_positions
         
@@ -268,143 +516,81 @@ class WealthManagementServer:
         # Tool 1: Get client list
         @self.server.list_tools()
         async def handle_list_tools() -> list[Tool]:
-            return [
-                Tool(
-                    name="get_clients",
-                    description="Retrieve list of all clients managed by the advisor. Returns comprehensive client information including IDs, names, risk profiles, and AUM.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "filter_by": {
-                                "type": "string",
-                                "description": "Optional filter criteria: 'active', 'under_review', 'high_aum' (>10M), 'new_clients' (last 90 days)",
-                                "enum": ["active", "under_review", "high_aum", "new_clients", "all"]
-                            },
-                            "sort_by": {
-                                "type": "string",
-                                "description": "Sort criteria for client list",
-                                "enum": ["name", "client_id", "total_aum", "onboarding_date", "last_review"]
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum number of clients to return (default: all)",
-                                "minimum": 1,
-                                "maximum": 100
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                Tool(
-                    name="get_client_positions",
-                    description="Retrieve detailed position information for a specific client. Returns equities, bonds, and cash positions with valuations, weights, and metadata.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "client_id": {
-                                "type": "string",
-                                "description": "Client identifier in format BZ-xxxxx",
-                                "pattern": "^BZ-[0-9]{5}$"
-                            },
-                            "asset_type": {
-                                "type": "string",
-                                "description": "Filter by asset type (optional)",
-                                "enum": ["equity", "bond", "cash", "all"]
-                            },
-                            "min_weight": {
-                                "type": "number",
-                                "description": "Minimum position weight threshold (optional)",
-                                "minimum": 0,
-                                "maximum": 1
-                            }
-                        },
-                        "required": ["client_id"]
-                    }
-                ),
-                Tool(
-                    name="get_recommendations", 
-                    description="Get investment recommendations (BUY/SELL/NEUTRAL) for specific ISINs or all available securities. Provides analyst ratings, target prices, and rationale.",
-                    inputSchema={
-                        "type": "object", 
-                        "properties": {
-                            "isins": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                                "description": "List of ISINs to get recommendations for. If empty, returns all available recommendations."
-                            },
-                            "rating_filter": {
-                                "type": "string",
-                                "enum": ["BUY", "SELL", "NEUTRAL", "all"],
-                                "description": "Filter recommendations by rating (optional)"
-                            },
-                            "asset_type": {
-                                "type": "string", 
-                                "enum": ["equity", "bond", "all"],
-                                "description": "Filter by asset type (optional)"
-                            }
-                        },
-                        "required": []
-                    }
-                )
-            ]
+            return _TOOLS
+        
+        # Tool name -> handler, resolved with a single dict lookup per call
+        self._dispatch = {
+            "get_clients": self._get_clients,
+            "get_client_positions": self._get_client_positions,
+            "get_recommendations": self._get_recommendations,
+        }
         
         @self.server.call_tool()
-        async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
-            if name == "get_clients":
-                return await self._get_clients(arguments)
-            elif name == "get_client_positions":
-                return await self._get_client_positions(arguments)
-            elif name == "get_recommendations":
-                return await self._get_recommendations(arguments)
-            else:
+        async def handle_call_tool(name: str, arguments: dict) -> list[TextContent | ResourceLink]:
+            handler = self._dispatch.get(name)
+            if handler is None:
                 raise ValueError(f"Unknown tool: {name}")
+            async with self._tool_slots:
+                return await handler(arguments)
 
 
-    async def _get_clients(self, arguments: dict) -> list[TextContent]:
-        logger.info("Serving clients request with arguments: %s", arguments)
-
+    async def _get_clients(self, arguments: dict) -> list[TextContent | ResourceLink]:
         """Handle get_clients tool calls"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Serving clients request with arguments: %s", arguments)
+        
         try:
             filter_by = arguments.get("filter_by", "all")
             sort_by = arguments.get("sort_by", "name")
             limit = arguments.get("limit", None)
             
-            # Filter clients
-            filtered_clients = self._filter_clients(filter_by)
-            
-            # Sort clients
-            filtered_clients = self._sort_clients(filtered_clients, sort_by)
-            
-            # Apply limit
-            if limit:
-                filtered_clients = filtered_clients[:limit]
+            # The new_clients view moves with the calendar, so its cached
+            # responses are keyed by day as well
+            as_of = datetime.now().date() if filter_by == "new_clients" else None
             
-            # Prepare response
-            response = {
-                "status": "success",
-                "total_clients": len(filtered_clients),
-                "filter_applied": filter_by,
-                "sort_by": sort_by,
-                "clients": filtered_clients
-            }
+            # Values outside the tool schema still get an answer, but bypass
+            # the response cache so they can't evict the real combinations
+            known_filter = filter_by in self._filter_views or filter_by == "new_clients"
+            if not known_filter or sort_by not in self._sorted_views:
+                return self._respond(self._render_clients(filter_by, sort_by, limit, as_of))
             
-            return [TextContent(
-                type="text",
-                text=json.dumps(response, indent=2)
-            )]
+            return self._render(self._render_clients, filter_by, sort_by, limit, as_of)
             
         except Exception as e:
             logger.error(f"Error in get_clients: {str(e)}")
-            return [TextContent(
-                type="text",
-                text=json.dumps({
-                    "status": "error",
-                    "message": f"Error retrieving client list: {str(e)}"
-                })
-            )]
+            return _err(f"Error retrieving client list: {str(e)}")
+
+
+    def _render_clients(self, filter_by: str, sort_by: str, limit: Optional[int], as_of: Optional[date] = None) -> str:
+        """Build the serialized get_clients response (cached by _render)"""
+        # Filter clients
+        filtered_clients, members = self._filter_clients(filter_by, as_of)
+        
+        # Sort clients
+        filtered_clients = self._sort_clients(filtered_clients, sort_by, members)
+        
+        # Apply limit
+        if limit:
+            filtered_clients = filtered_clients[:limit]
+        
+        # Prepare response: serialize the small envelope, then splice in the
+        # pre-serialized client fragments as the trailing "clients" array
+        envelope = _dumps({
+            "status": "success",
+            "total_clients": len(filtered_clients),
+            "filter_applied": filter_by,
+            "sort_by": sort_by
+        })
+        if filtered_clients:
+            fragments = self._client_fragments
+            clients_json = "[\n" + ",\n".join(fragments[c["client_id"]] for c in filtered_clients) + "\n  ]"
+        else:
+            clients_json = "[]"
+        
+        return envelope[:-2] + ',\n  "clients": ' + clients_json + "\n}"
 
 
-    async def _get_client_positions(self, arguments: dict) -> list[TextContent]:
+    async def _get_client_positions(self, arguments: dict) -> list[TextContent | ResourceLink]:
         """Handle get_client_positions tool calls"""
         try:
             client_id = arguments.get("client_id")
@@ -412,200 +598,351 @@ class WealthManagementServer:
             min_weight = arguments.get("min_weight", 0)
             
             if not client_id:
-                return [TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "status": "error",
-                        "message": "client_id is required"
-                    })
-                )]
+                return _err("client_id is required")
             
             # Validate client exists
-            client = next((c for c in self.clients_data if c["client_id"] == client_id), None)
+            client = self._client_index.get(client_id)
             if not client:
-                return [TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "status": "error",
-                        "message": f"Client {client_id} not found"
-                    })
-                )]
-            
-            # Get positions for client
-            positions = self.positions_data.get(client_id, [])
+                return _err(f"Client {client_id} not found")
             
-            # Filter by asset type
-            if asset_type != "all":
-                positions = [pos for pos in positions if pos["asset_type"] == asset_type]
-            
-            # Filter by minimum weight
-            if min_weight > 0:
-                positions = [pos for pos in positions if pos["weight"] >= min_weight]
-            
-            # Calculate summary statistics
-            total_value = sum(pos.get("market_value", pos.get("amount", 0)) for pos in positions)
-            equity_count = len([pos for pos in positions if pos["asset_type"] == "equity"])
-            bond_count = len([pos for pos in positions if pos["asset_type"] == "bond"])
-            cash_count = len([pos for pos in positions if pos["asset_type"] == "cash"])
-            
-            # Prepare response
-            response = {
-                "status": "success",
-                "client_id": client_id,
-                "client_name": client["name"],
-                "total_aum": client["total_aum"],
-                "positions_summary": {
-                    "total_positions": len(positions),
-                    "total_value": round(total_value, 2),
-                    "equity_positions": equity_count,
-                    "bond_positions": bond_count,
-                    "cash_positions": cash_count
-                },
-                "filters_applied": {
-                    "asset_type": asset_type,
-                    "min_weight": min_weight
-                },
-                "positions": positions
-            }
-            
-            return [TextContent(
-                type="text",
-                text=json.dumps(response, indent=2)
-            )]
+            return self._render(self._render_client_positions, client_id, asset_type, min_weight)
             
         except Exception as e:
             logger.error(f"Error in get_client_positions: {str(e)}")
-            return [TextContent(
-                type="text",
-                text=json.dumps({
-                    "status": "error",
-                    "message": f"Error retrieving client positions: {str(e)}"
-                })
-            )]
+            return _err(f"Error retrieving client positions: {str(e)}")
 
 
+    def _render_client_positions(self, client_id: str, asset_type: str, min_weight: float) -> str:
+        """Build the serialized get_client_positions response (cached by _render)"""
+        client = self._client_index[client_id]
+        
+        # Get positions for client, already grouped by asset type, along with
+        # the precomputed summary of the whole group
+        positions, weights, values, summary = self._position_columns[client_id].get(asset_type, _EMPTY_POSITION_GROUP)
+        
+        # Filter by minimum weight using the weight column as a mask; only
+        # then does the summary need recomputing
+        if min_weight > 0:
+            mask = [weight >= min_weight for weight in weights]
+            positions = list(itertools.compress(positions, mask))
+            summary = self._summarize_positions(positions, itertools.compress(values, mask))
+        
+        # Prepare response
+        response = {
+            "status": "success",
+            "client_id": client_id,
+            "client_name": client["name"],
+            "total_aum": client["total_aum"],
+            "positions_summary": summary,
+            "filters_applied": {
+                "asset_type": asset_type,
+                "min_weight": min_weight
+            },
+            "positions": positions
+        }
+        
+        return _dumps(response)
+
+
+    @staticmethod
+    def _summarize_positions(positions: List[Position], values) -> Dict[str, Any]:
+        """Summary statistics for a list of positions and their values"""
+        type_counts = {"equity": 0, "bond": 0, "cash": 0}
+        for pos in positions:
+            type_counts[pos.asset_type] += 1
+        
+        return {
+            "total_positions": len(positions),
+            "total_value": round(sum(values), 2),
+            "equity_positions": type_counts["equity"],
+            "bond_positions": type_counts["bond"],
+            "cash_positions": type_counts["cash"]
+        }
+
 
-    async def _get_recommendations(self, arguments: dict) -> list[TextContent]:
-        logger.info("Serving recommendations request with arguments: %s", arguments)
 
+    async def _get_recommendations(self, arguments: dict) -> list[TextContent | ResourceLink]:
         """Handle get_recommendations tool calls"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Serving recommendations request with arguments: %s", arguments)
+        
         try:
             isins = arguments.get("isins", []) if arguments else []
             rating_filter = arguments.get("rating_filter", "all") if arguments else "all" 
             asset_type = arguments.get("asset_type", "all") if arguments else "all"
             
-            recommendations = []
-            
-            # If no specific ISINs requested, get all available recommendations
-            if not isins:
-                isins = list(self.RECOMMENDATIONS_DATABASE.keys())
-            
-            for isin in isins:
-                if isin not in self.RECOMMENDATIONS_DATABASE:
-                    continue
-                    
-                recommendation = self.RECOMMENDATIONS_DATABASE[isin].copy()
-                security_info = self.SECURITIES_DATABASE.get(isin, {})
-                
-                # Apply asset type filter
-                if asset_type != "all" and security_info.get("type") != asset_type:
-                    continue
-                    
-                # Apply rating filter  
-                if rating_filter != "all" and recommendation["rating"] != rating_filter:
-                    continue
-                    
-                # Enhance with security information
-                recommendation["isin"] = isin
-                recommendation["security_name"] = security_info.get("name", "Unknown")
-                recommendation["security_type"] = security_info.get("type", "unknown")
-                recommendation["sector"] = security_info.get("sector", "N/A")
-                
-                recommendations.append(recommendation)
-            
-            # Sort by rating priority (BUY > NEUTRAL > SELL) then by last_updated
-            rating_priority = {"BUY": 3, "NEUTRAL": 2, "SELL": 1}
-            recommendations.sort(key=lambda x: (rating_priority.get(x["rating"], 0), x["last_updated"]), reverse=True)
-            
-            # Calculate summary statistics
-            rating_counts = {"BUY": 0, "SELL": 0, "NEUTRAL": 0}
-            for rec in recommendations:
-                rating_counts[rec["rating"]] += 1
-                
-            response = {
-                "recommendations": recommendations,
-                "summary": {
-                    "total_recommendations": len(recommendations), 
-                    "rating_breakdown": rating_counts,
-                    "filters_applied": {
-                        "specific_isins": len(arguments.get("isins", [])) > 0 if arguments else False,
-                        "rating_filter": rating_filter,
-                        "asset_type": asset_type
-                    }
-                },
-                "metadata": {
-                    "timestamp": "2025-07-19T10:30:00Z",
-                    "research_teams": ["Tech Research Team", "Fixed Income Team", "Credit Research Team", 
-                                    "Auto Research Team", "Financial Services Team", "AI Research Team",
-                                    "Consumer Research Team", "Semiconductor Team", "Media Research Team", 
-                                    "Healthcare Team"]
-                }
-            }
+            specific_isins = len(arguments.get("isins", [])) > 0 if arguments else False
             
-            return [TextContent(type="text", text=json.dumps(response, indent=2))]
+            return self._render(self._render_recommendations, tuple(isins or ()), rating_filter, asset_type, specific_isins)
 
                         
         except Exception as e:
             logger.error(f"Error in get_recommendations: {str(e)}")
-            return [TextContent(
-                type="text",
-                text=json.dumps({
-                    "status": "error",
-                    "message": f"Error retrieving recommendations: {str(e)}"
-                })
-            )]
+            return _err(f"Error retrieving recommendations: {str(e)}")
 
 
-    def _filter_clients(self, filter_by: str) -> List[Dict[str, Any]]:
-        """Filter clients based on criteria"""
-        if filter_by == "all":
-            return self.clients_data
+    def _render_recommendations(self, isins: tuple, rating_filter: str, asset_type: str, specific_isins: bool) -> str:
+        """Build the serialized get_recommendations response (cached by _render)"""
+        if isins:
+            # Specific ISINs: keep request order (and duplicates), skip unknown ones
+            recommendations = [self._enriched_recs[isin] for isin in isins if isin in self._enriched_recs]
+            if rating_filter != "all":
+                recommendations = [rec for rec in recommendations if rec["rating"] == rating_filter]
+            if asset_type != "all":
+                recommendations = [rec for rec in recommendations if rec["security_type"] == asset_type]
+            
+            # Sort by rating priority (BUY > NEUTRAL > SELL) then by last_updated
+            recommendations = sorted(recommendations, key=self._recommendation_sort_key, reverse=True)
+        else:
+            # No specific ISINs requested: use the prebuilt (already sorted)
+            # bucket for the filters
+            recommendations = self._recs_by_filter.get((rating_filter, asset_type), [])
         
-        filtered = []
-        current_date = datetime.now()
+        # Calculate summary statistics
+        rating_counts = {"BUY": 0, "SELL": 0, "NEUTRAL": 0}
+        for rec in recommendations:
+            rating_counts[rec["rating"]] += 1
         
-        for client in self.clients_data:
-            if filter_by == "active":
-                if client["status"] == "Active":
-                    filtered.append(client)
-            elif filter_by == "under_review":
-                if client["status"] == "Under Review":
-                    filtered.append(client)
-            elif filter_by == "high_aum":
-                if client["total_aum"] > 10000000:  # >10M
-                    filtered.append(client)
-            elif filter_by == "new_clients":
-                onboarding_date = datetime.strptime(client["onboarding_date"], "%Y-%m-%d")
-                if (current_date - onboarding_date).days <= 90:
-                    filtered.append(client)
-        
-        return filtered
-
-
-    def _sort_clients(self, clients: List[Dict[str, Any]], sort_by: str) -> List[Dict[str, Any]]:
-        """Sort clients based on criteria"""
-        if sort_by == "name":
-            return sorted(clients, key=lambda x: x["name"])
-        elif sort_by == "client_id":
-            return sorted(clients, key=lambda x: x["client_id"])
-        elif sort_by == "total_aum":
-            return sorted(clients, key=lambda x: x["total_aum"], reverse=True)
-        elif sort_by == "onboarding_date":
-            return sorted(clients, key=lambda x: x["onboarding_date"], reverse=True)
-        elif sort_by == "last_review":
-            return sorted(clients, key=lambda x: x["last_review"], reverse=True)
-        else:
+        response = {
+            "recommendations": recommendations,
+            "summary": {
+                "total_recommendations": len(recommendations), 
+                "rating_breakdown": rating_counts,
+                "filters_applied": {
+                    "specific_isins": specific_isins,
+                    "rating_filter": rating_filter,
+                    "asset_type": asset_type
+                }
+            },
+            "metadata": {
+                "timestamp": "2025-07-19T10:30:00Z",
+                "research_teams": ["Tech Research Team", "Fixed Income Team", "Credit Research Team", 
+                                "Auto Research Team", "Financial Services Team", "AI Research Team",
+                                "Consumer Research Team", "Semiconductor Team", "Media Research Team", 
+                                "Healthcare Team"]
+            }
+        }
+        
+        return _dumps(response)
+
+
+    def _build_views(self):
+        """Precompute filtered/sorted client views and grouped positions over the static sample data"""
+        # Date columns parsed once into day ordinals for numeric compares/sorts
+        self._onboarding_days = {
+            c["client_id"]: date.fromisoformat(c["onboarding_date"]).toordinal()
+            for c in self.clients_data
+        }
+        self._review_days = {
+            c["client_id"]: date.fromisoformat(c["last_review"]).toordinal()
+            for c in self.clients_data
+        }
+        
+        # Each client serialized once, indented to its depth inside the
+        # get_clients "clients" array
+        self._client_fragments = {
+            c["client_id"]: textwrap.indent(_dumps(c), "    ")
+            for c in self.clients_data
+        }
+        
+        self._filter_views = {
+            "all": self.clients_data,
+            "active": [c for c in self.clients_data if c["status"] == "Active"],
+            "under_review": [c for c in self.clients_data if c["status"] == "Under Review"],
+            "high_aum": [c for c in self.clients_data if c["total_aum"] > 10000000],  # >10M
+        }
+        # id()-membership of each filter view, used to intersect it with the
+        # presorted views below ("new_clients" keeps its own alongside its view)
+        self._filter_members = {
+            filter_by: frozenset(map(id, view))
+            for filter_by, view in self._filter_views.items()
+        }
+        
+        # sort_by -> (key, reverse); plain fields use C-level itemgetter keys
+        sort_keys = {
+            "name": (itemgetter("name"), False),
+            "client_id": (itemgetter("client_id"), False),
+            "total_aum": (itemgetter("total_aum"), True),
+            "onboarding_date": (lambda x: self._onboarding_days[x["client_id"]], True),
+            "last_review": (lambda x: self._review_days[x["client_id"]], True),
+        }
+        self._sorted_views = {
+            sort_by: sorted(self.clients_data, key=key, reverse=reverse)
+            for sort_by, (key, reverse) in sort_keys.items()
+        }
+        # Sort orders that coincide with generation order (client_id, since
+        # ids are issued sequentially); filter views already come out sorted
+        self._generation_ordered = {
+            sort_by for sort_by, view in self._sorted_views.items()
+            if all(a is b for a, b in zip(view, self.clients_data))
+        }
+        
+        # Positions per client grouped by asset type ("all" keeps the full
+        # list); each group preserves the generated position order and carries
+        # parallel weight and value (market_value, or amount for cash) columns
+        # so filtering and totals don't go back through the records, plus the
+        # summary of the unfiltered group
+        self._position_columns = {}
+        for client_id, positions in self.positions_data.items():
+            groups = {"all": positions, "equity": [], "bond": [], "cash": []}
+            for pos in positions:
+                groups[pos.asset_type].append(pos)
+            self._position_columns[client_id] = {}
+            for key, group in groups.items():
+                values = [pos.value for pos in group]
+                self._position_columns[client_id][key] = (
+                    group,
+                    [pos.weight for pos in group],
+                    values,
+                    self._summarize_positions(group, values),
+                )
+        
+        # The "new_clients" window moves with the calendar, so that view is
+        # rebuilt lazily once per day: (date, clients, id() membership)
+        self._new_clients_view = (None, [], frozenset())
+
+
+    @classmethod
+    def _recommendation_sort_key(cls, rec: Dict[str, Any]) -> tuple:
+        """Sort key for recommendations: rating priority, then last_updated"""
+        return (cls.RATING_PRIORITY.get(rec["rating"], 0), rec["last_updated"])
+
+
+    def _build_recommendation_index(self):
+        """Precompute recommendations enriched with security data, bucketed by filter"""
+        self._enriched_recs = {}
+        for isin, rec in self.RECOMMENDATIONS_DATABASE.items():
+            security_info = self.SECURITIES_DATABASE.get(isin, {})
+            self._enriched_recs[isin] = {
+                **rec,
+                "isin": isin,
+                "security_name": security_info.get("name", "Unknown"),
+                "security_type": security_info.get("type", "unknown"),
+                "sector": security_info.get("sector", "N/A")
+            }
+        
+        # (rating_filter, asset_type) -> matching recommendations, sorted the
+        # way responses list them
+        all_sorted = sorted(self._enriched_recs.values(), key=self._recommendation_sort_key, reverse=True)
+        self._recs_by_filter = {}
+        for rating_filter in ("all", "BUY", "SELL", "NEUTRAL"):
+            for asset_type in ("all", "equity", "bond"):
+                self._recs_by_filter[rating_filter, asset_type] = [
+                    rec for rec in all_sorted
+                    if (rating_filter == "all" or rec["rating"] == rating_filter)
+                    and (asset_type == "all" or rec["security_type"] == asset_type)
+                ]
+
+
+    def _filter_clients(self, filter_by: str,
+                        as_of: Optional[date] = None) -> tuple[List[Dict[str, Any]], Optional[frozenset]]:
+        """Filter clients based on criteria (as_of: the request's date for new_clients);
+        returns the clients along with their id() membership set, if precomputed"""
+        if filter_by == "new_clients":
+            today = as_of or datetime.now().date()
+            view_date, view, members = self._new_clients_view
+            if view_date != today:
+                cutoff = today.toordinal() - 90
+                view = [
+                    c for c in self.clients_data
+                    if self._onboarding_days[c["client_id"]] >= cutoff
+                ]
+                members = frozenset(map(id, view))
+                # Published with a single assignment, so a render running
+                # concurrently sees either day's view and membership, never a mix
+                self._new_clients_view = (today, view, members)
+            return view, members
+        
+        return self._filter_views.get(filter_by, []), self._filter_members.get(filter_by)
+
+
+    def _sort_clients(self, clients: List[Dict[str, Any]], sort_by: str,
+                      members: Optional[frozenset] = None) -> List[Dict[str, Any]]:
+        """Sort clients based on criteria (members: precomputed id() set of clients)"""
+        sorted_view = self._sorted_views.get(sort_by)
+        if sorted_view is None:
             return clients
+        if clients is self.clients_data:
+            return sorted_view
+        if sort_by in self._generation_ordered:
+            return clients
+        
+        # Walk the presorted view and keep members of the filtered subset;
+        # both lists preserve generation order, so ties come out as sorted() would
+        selected = members if members is not None else {id(c) for c in clients}
+        return [c for c in sorted_view if id(c) in selected]
+
+
+    def _render(self, render, *args) -> list[TextContent | ResourceLink]:
+        """Return the cached tool result for render(*args), rendering and
+        wrapping it (see _respond) on a miss. Renders stay on the event loop:
+        they are short and CPU-bound, and a handler left waiting on a worker
+        thread when stdin reaches EOF loses its reply once the session closes
+        the write stream"""
+        cache = self._response_caches[render.__name__]
+        # Argument types are part of the key (like lru_cache(typed=True)), since
+        # e.g. min_weight 0 and 0.0 serialize differently
+        key = (args, tuple(map(type, args)))
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            content, linked_body = entry
+            if linked_body is not None:
+                # Keep the body readable for as long as its link is handed out
+                self._store_body(content[1].name[len("wm-"):], linked_body)
+            return content
+        
+        text = render(*args)
+        content = self._respond(text)
+        cache[key] = (content, text if len(content) > 1 else None)
+        if len(cache) > self.RESPONSE_CACHE_SIZES[render.__name__]:
+            cache.popitem(last=False)
+        return content
+
+
+    @classmethod
+    def _preview(cls, text: str, uri: str, size: int) -> Dict[str, Any]:
+        """Inline stand-in for an oversized response: its summary counts and
+        first few items, so a client can decide whether to fetch the rest"""
+        full = json.loads(text)
+        preview = {
+            "status": "success",
+            "truncated": True,
+            "message": f"Response too large to inline; showing the first {cls.PREVIEW_ITEMS} items, read the linked resource for the full result",
+            "resource_uri": uri,
+            "size_bytes": size
+        }
+        for key in ("total_clients", "positions_summary", "summary"):
+            if key in full:
+                preview[key] = full[key]
+        for key in ("clients", "positions", "recommendations"):
+            if key in full:
+                preview[key] = full[key][:cls.PREVIEW_ITEMS]
+        return preview
+
+
+    def _respond(self, text: str) -> list[TextContent | ResourceLink]:
+        """Wrap a serialized response, moving oversized bodies behind a resource link"""
+        if len(text) <= self.INLINE_RESPONSE_LIMIT:
+            return [TextContent(type="text", text=text)]
+        
+        body = text.encode()
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        uri = f"memory://wm/{digest}"
+        self._store_body(digest, text)
+        
+        return [
+            TextContent(type="text", text=_dumps(self._preview(text, uri, len(body)))),
+            ResourceLink(type="resource_link", name=f"wm-{digest}", uri=uri,
+                         mimeType="application/json", size=len(body))
+        ]
+
+
+    def _store_body(self, digest: str, text: str):
+        """Add (or refresh) an oversized body in the refcache, evicting the least recently stored"""
+        self._refcache[digest] = self._refcache.pop(digest, text)
+        if len(self._refcache) > self.REFCACHE_SIZE:
+            self._refcache.pop(next(iter(self._refcache)))
 
 
     def _setup_handlers(self):
@@ -613,10 +950,15 @@ class WealthManagementServer:
         
         @self.server.list_resources()
         async def handle_list_resources() -> list[Resource]:
-            return []
+            return _EMPTY_RESOURCES
         
         @self.server.read_resource()
-        async def handle_read_resource(uri: 'AnyUrl') -> str:
+        async def handle_read_resource(uri: 'AnyUrl') -> list[ReadResourceContents]:
+            uri_text = str(uri)
+            if uri_text.startswith("memory://wm/"):
+                text = self._refcache.get(uri_text[len("memory://wm/"):])
+                if text is not None:
+                    return [ReadResourceContents(content=text, mime_type="application/json")]
             raise ValueError(f"Resource not found: {uri}")
 
 
@@ -626,7 +968,7 @@ class WealthManagementServer:
         logger.info(f"Generated {len(self.clients_data)} sample clients")
         logger.info(f"Generated positions for {len(self.clients_data)} clients")
         
-        async with stdio_server() as (read_stream, write_stream):
+        async with batched_stdio_server() as (read_stream, write_stream):
             await self.server.run(
                 read_stream,
                 write_stream,
@@ -647,4 +989,12 @@ async def main():
     await server.run()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    logging.basicConfig(level=logging.INFO)
+    
+    # Optional libuv-based event loop (pip install uvloop), stock asyncio otherwise
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
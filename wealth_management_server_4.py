@@ -5,13 +5,22 @@ Complete implementation with cross-tool functionality, error handling, and valid
 """
 
 import asyncio
+import bisect
+import dataclasses
+import functools
+import hashlib
+import heapq
 import json
 import logging
 import random
 import re
 import sys
-from datetime import datetime, timedelta
-from typing import Any, Sequence, Dict, List, Optional, Set, Tuple
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any, Sequence, Dict, FrozenSet, List, Optional, Set, Tuple
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 from mcp.types import (
@@ -22,56 +31,199 @@ from mcp.types import (
     EmbeddedResource,
     LoggingLevel,
 )
-from mcp.server.stdio import stdio_server
 import mcp.types as types
 
+from stdio_batching import batched_stdio_server
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("wealth-management-mcp-server")
 
+# Optional faster JSON serializer (pip install orjson), stdlib json otherwise
+try:
+    import orjson
+
+    def _dump(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    def _dump_compact(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dump(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+    def _dump_compact(obj: Any) -> str:
+        return json.dumps(obj)
+
+# Placeholder for the response timestamp in cached bodies, and its JSON
+# encoding (without the surrounding quotes)
+_TIMESTAMP_SLOT = "\x00timestamp\x00"
+_TIMESTAMP_SLOT_JSON = _dump(_TIMESTAMP_SLOT)[1:-1]
+
+_CLIENT_ID_RE = re.compile(r'^BZ-\d{5}$')
+
+# Shared read-only stand-in for missing tool arguments
+_EMPTY_ARGS = MappingProxyType({})
+
+# Longest arguments echo, in encoded characters, kept in an error response
+_ERROR_ARGS_LIMIT = 2048
+
+
+def _error_arguments(arguments: Any) -> Dict[str, Any]:
+    """Arguments echo for an error response, truncated and hashed past _ERROR_ARGS_LIMIT"""
+    encoded = json.dumps(arguments, separators=(",", ":"))
+    if len(encoded) <= _ERROR_ARGS_LIMIT:
+        return {"arguments": arguments}
+    return {
+        "arguments": encoded[:_ERROR_ARGS_LIMIT] + "...",
+        "arguments_truncated": True,
+        "arguments_hash": hashlib.blake2b(encoded.encode(), digest_size=8).hexdigest()
+    }
+
+# (epoch second, its ISO 8601 local time) last formatted by _now_iso
+_now_iso_cache: Tuple[int, str] = (-1, "")
+
+
+def _now_iso() -> str:
+    """Current local time in ISO 8601 to the second, formatted once per second"""
+    global _now_iso_cache
+    second = int(time.time())
+    if second != _now_iso_cache[0]:
+        _now_iso_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _now_iso_cache[1]
+
+
+def _make_aligner(target: Dict[str, Tuple[int, int]]):
+    """Build a scorer for one risk profile with its target ranges bound as locals"""
+    cash_lo, cash_hi = target["cash"]
+    bond_lo, bond_hi = target["bonds"]
+    equity_lo, equity_hi = target["equities"]
+
+    def align(cash_pct: float, bond_pct: float, equity_pct: float) -> Tuple[int, List[str]]:
+        alignment_score = 0
+        issues = []
+        
+        if cash_lo <= cash_pct <= cash_hi:
+            alignment_score += 33
+        else:
+            issues.append(f"Cash allocation {cash_pct:.1f}% outside target range {cash_lo}-{cash_hi}%")
+        
+        if bond_lo <= bond_pct <= bond_hi:
+            alignment_score += 33
+        else:
+            issues.append(f"Bond allocation {bond_pct:.1f}% outside target range {bond_lo}-{bond_hi}%")
+        
+        if equity_lo <= equity_pct <= equity_hi:
+            alignment_score += 34
+        else:
+            issues.append(f"Equity allocation {equity_pct:.1f}% outside target range {equity_lo}-{equity_hi}%")
+        
+        return alignment_score, issues
+
+    return align
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ClientPortfolio:
+    """A client's generated positions plus aggregates computed when the
+    portfolio is cached, so the advanced queries don't re-scan positions"""
+    positions: List[Dict[str, Any]]
+    totals: Dict[str, float]  # total value per asset type (cash by amount)
+    sell_isins: Set[str]  # held ISINs with a SELL recommendation
+    isin_set: Set[str]  # every ISIN held
+
+    @classmethod
+    def from_positions(cls, positions: List[Dict[str, Any]]) -> "ClientPortfolio":
+        values = {"cash": [], "equity": [], "bond": []}
+        isin_set = set()
+        for pos in positions:
+            value = pos.get("valuation")
+            values[pos["type"]].append(pos["amount"] if value is None else value)
+            if "isin" in pos:
+                isin_set.add(pos["isin"])
+        sell_isins = isin_set & SELL_ISINS
+        # sum() per type keeps the same rounding as summing the positions directly
+        return cls(positions, {k: sum(v) for k, v in values.items()}, sell_isins, isin_set)
+
 
 class WealthManagementServer:
 
-    # Cache for client positions to ensure consistency
-    CLIENT_POSITIONS_CACHE = {}
+    # Seed for position generation - keeps restarts reproducible
+    POSITIONS_SEED = 42
+
+    # Cache for client portfolios to ensure consistency
+    CLIENT_POSITIONS_CACHE: Dict[str, ClientPortfolio] = {}
+
+    # ISIN -> IDs of the clients holding it, in SAMPLE_CLIENTS order; built
+    # from the full cache on first use (see get_security_holders)
+    SECURITY_HOLDERS: Dict[str, List[str]] = {}
+
+    # Set once the shared caches above hold every client (see _warm_cache)
+    _warmup_done = False
 
     def __init__(self):
         self.server = Server("wealth-management-mcp-server")
+        
+        # The sample data is static, so serialized responses are reused per
+        # argument set; see invalidate_tool_cache and stats
+        self._render_clients = functools.lru_cache(maxsize=256, typed=True)(self._render_clients)
+        self._render_client_positions = functools.lru_cache(maxsize=256, typed=True)(self._render_client_positions)
+        self._render_recommendations = functools.lru_cache(maxsize=256, typed=True)(self._render_recommendations)
+        self._tool_renderers = {
+            "get_clients": self._render_clients,
+            "get_client_positions": self._render_client_positions,
+            "get_recommendations": self._render_recommendations,
+        }
+        
+        if not self._warmup_done:
+            self._warm_cache()
         self._register_tools()
         
+    def _warm_cache(self):
+        """Generate every client's portfolio and the holder index up front, so
+        no request pays the generation cost"""
+        for client in SAMPLE_CLIENTS:
+            self.get_client_portfolio(client["client_id"])
+        self.get_security_holders()
+        WealthManagementServer._warmup_done = True
+        
     def generate_client_positions(self, client_id: str) -> List[Dict[str, Any]]:
         """Generate realistic portfolio positions for a client based on their risk profile"""
-        client = next((c for c in SAMPLE_CLIENTS if c["client_id"] == client_id), None)
+        client = CLIENTS_BY_ID.get(client_id)
         if not client:
             return []
         
+        # Seeded per client, so a portfolio doesn't depend on which clients
+        # were generated before it
+        rng = random.Random(f"{self.POSITIONS_SEED}:{client_id}")
+        
         positions = []
         risk_profile = client["risk_profile"]
         total_aum = client["total_aum"]
         
         # Get available securities
-        equities = [isin for isin, data in SECURITIES_DATABASE.items() if data["type"] == "equity"]
-        bonds = [isin for isin, data in SECURITIES_DATABASE.items() if data["type"] == "bond"]
+        equities = EQUITY_ISINS
+        bonds = BOND_ISINS
         
         # Risk-based allocation
         if risk_profile == "Conservative":
-            cash_pct = random.uniform(0.15, 0.25)  # 15-25% cash
-            bond_pct = random.uniform(0.50, 0.65)  # 50-65% bonds
+            cash_pct = rng.uniform(0.15, 0.25)  # 15-25% cash
+            bond_pct = rng.uniform(0.50, 0.65)  # 50-65% bonds
             equity_pct = 1 - cash_pct - bond_pct   # Remainder in equities
-            num_equities = random.randint(2, 4)
-            num_bonds = random.randint(3, 6)
+            num_equities = rng.randint(2, 4)
+            num_bonds = rng.randint(3, 6)
         elif risk_profile == "Moderate":
-            cash_pct = random.uniform(0.05, 0.15)  # 5-15% cash
-            bond_pct = random.uniform(0.30, 0.45)  # 30-45% bonds
+            cash_pct = rng.uniform(0.05, 0.15)  # 5-15% cash
+            bond_pct = rng.uniform(0.30, 0.45)  # 30-45% bonds
             equity_pct = 1 - cash_pct - bond_pct   # Remainder in equities
-            num_equities = random.randint(4, 7)
-            num_bonds = random.randint(2, 4)
+            num_equities = rng.randint(4, 7)
+            num_bonds = rng.randint(2, 4)
         else:  # Aggressive
-            cash_pct = random.uniform(0.02, 0.08)  # 2-8% cash
-            bond_pct = random.uniform(0.10, 0.25)  # 10-25% bonds
+            cash_pct = rng.uniform(0.02, 0.08)  # 2-8% cash
+            bond_pct = rng.uniform(0.10, 0.25)  # 10-25% bonds
             equity_pct = 1 - cash_pct - bond_pct   # Remainder in equities
-            num_equities = random.randint(6, 10)
-            num_bonds = random.randint(1, 3)
+            num_equities = rng.randint(6, 10)
+            num_bonds = rng.randint(1, 3)
         
         # Add cash position
         cash_amount = total_aum * cash_pct
@@ -83,7 +235,7 @@ class WealthManagementServer:
         })
         
         # Add equity positions
-        selected_equities = random.sample(equities, min(num_equities, len(equities)))
+        selected_equities = rng.sample(equities, min(num_equities, len(equities)))
         equity_allocation = total_aum * equity_pct
         
         for i, isin in enumerate(selected_equities):
@@ -91,11 +243,11 @@ class WealthManagementServer:
             if i == len(selected_equities) - 1:  # Last position gets remainder
                 position_value = equity_allocation
             else:
-                position_value = equity_allocation * random.uniform(0.8, 1.2) / len(selected_equities)
+                position_value = equity_allocation * rng.uniform(0.8, 1.2) / len(selected_equities)
                 equity_allocation -= position_value
             
             # Calculate shares and price
-            base_price = random.uniform(50, 400)
+            base_price = rng.uniform(50, 400)
             shares = int(position_value / base_price)
             actual_value = shares * base_price
             
@@ -111,7 +263,7 @@ class WealthManagementServer:
             })
         
         # Add bond positions
-        selected_bonds = random.sample(bonds, min(num_bonds, len(bonds)))
+        selected_bonds = rng.sample(bonds, min(num_bonds, len(bonds)))
         bond_allocation = total_aum * bond_pct
         
         for i, isin in enumerate(selected_bonds):
@@ -119,11 +271,11 @@ class WealthManagementServer:
             if i == len(selected_bonds) - 1:  # Last position gets remainder
                 position_value = bond_allocation
             else:
-                position_value = bond_allocation * random.uniform(0.8, 1.2) / len(selected_bonds)
+                position_value = bond_allocation * rng.uniform(0.8, 1.2) / len(selected_bonds)
                 bond_allocation -= position_value
                 
             nominal = int(position_value / 100) * 100  # Round to nearest $100
-            price_percent = random.uniform(98, 104)
+            price_percent = rng.uniform(98, 104)
             actual_value = nominal * (price_percent / 100)
             
             positions.append({
@@ -140,16 +292,28 @@ class WealthManagementServer:
         
         return positions
 
-    def get_client_positions(self, client_id: str) -> List[Dict[str, Any]]:
-        """Get or generate client positions"""
+    def get_client_portfolio(self, client_id: str) -> ClientPortfolio:
+        """Get or generate a client's portfolio"""
         if client_id not in self.CLIENT_POSITIONS_CACHE:
-            self.CLIENT_POSITIONS_CACHE[client_id] = self.generate_client_positions(client_id)
+            self.CLIENT_POSITIONS_CACHE[client_id] = ClientPortfolio.from_positions(self.generate_client_positions(client_id))
         return self.CLIENT_POSITIONS_CACHE[client_id]
 
+    def get_security_holders(self) -> Dict[str, List[str]]:
+        """Get or build the reverse index from ISIN to holding clients"""
+        if not self.SECURITY_HOLDERS:
+            for client in SAMPLE_CLIENTS:
+                client_id = client["client_id"]
+                for isin in self.get_client_portfolio(client_id).isin_set:
+                    self.SECURITY_HOLDERS.setdefault(isin, []).append(client_id)
+        return self.SECURITY_HOLDERS
+
+    def get_client_positions(self, client_id: str) -> List[Dict[str, Any]]:
+        """Get or generate client positions"""
+        return self.get_client_portfolio(client_id).positions
+
     def validate_client_id(self, client_id: str) -> bool:
         """Validate client ID format"""
-        pattern = r'^BZ-\d{5}$'
-        return bool(re.match(pattern, client_id))
+        return _CLIENT_ID_RE.match(client_id) is not None
 
     def get_clients_with_sell_rated_positions(self) -> List[Dict[str, Any]]:
         """Advanced query: Find clients with SELL-rated positions"""
@@ -157,23 +321,23 @@ class WealthManagementServer:
         
         for client in SAMPLE_CLIENTS:
             client_id = client["client_id"]
-            positions = self.get_client_positions(client_id)
+            portfolio = self.get_client_portfolio(client_id)
+            sell_isins = portfolio.sell_isins
+            if not sell_isins:
+                continue
             
             sell_positions = []
-            for position in positions:
-                if position["type"] in ["equity", "bond"] and "isin" in position:
+            for position in portfolio.positions:
+                if position.get("isin") in sell_isins:
                     isin = position["isin"]
-                    if isin in RECOMMENDATIONS_DATABASE:
-                        recommendation = RECOMMENDATIONS_DATABASE[isin]
-                        if recommendation["rating"] == "SELL":
-                            sell_positions.append({
-                                "isin": isin,
-                                "name": position["name"],
-                                "type": position["type"],
-                                "weight": position["weight"],
-                                "valuation": position["valuation"],
-                                "recommendation": recommendation
-                            })
+                    sell_positions.append({
+                        "isin": isin,
+                        "name": position["name"],
+                        "type": position["type"],
+                        "weight": position["weight"],
+                        "valuation": position["valuation"],
+                        "recommendation": RECOMMENDATIONS_DATABASE[isin]
+                    })
             
             if sell_positions:
                 total_sell_exposure = sum(pos["valuation"] for pos in sell_positions)
@@ -192,10 +356,7 @@ class WealthManagementServer:
         
         for client in SAMPLE_CLIENTS:
             client_id = client["client_id"]
-            positions = self.get_client_positions(client_id)
-            
-            cash_positions = [pos for pos in positions if pos["type"] == "cash"]
-            total_cash = sum(pos["amount"] for pos in cash_positions)
+            total_cash = self.get_client_portfolio(client_id).totals["cash"]
             cash_percentage = (total_cash / client["total_aum"]) * 100
             
             if cash_percentage > threshold_pct:
@@ -212,11 +373,11 @@ class WealthManagementServer:
         """Advanced query: Find clients holding specific security"""
         results = []
         
-        for client in SAMPLE_CLIENTS:
-            client_id = client["client_id"]
-            positions = self.get_client_positions(client_id)
+        for client_id in self.get_security_holders().get(isin, []):
+            client = CLIENTS_BY_ID[client_id]
+            portfolio = self.get_client_portfolio(client_id)
             
-            matching_positions = [pos for pos in positions if pos.get("isin") == isin]
+            matching_positions = [pos for pos in portfolio.positions if pos.get("isin") == isin]
             
             if matching_positions:
                 for position in matching_positions:
@@ -236,13 +397,13 @@ class WealthManagementServer:
         
         for client in SAMPLE_CLIENTS:
             client_id = client["client_id"]
-            positions = get_client_positions(client_id)
+            portfolio = self.get_client_portfolio(client_id)
             
-            has_asset_type = any(pos["type"] == asset_type for pos in positions)
+            asset_positions = [pos for pos in portfolio.positions if pos["type"] == asset_type]
+            has_asset_type = bool(asset_positions)
             
-            if (has_asset_type and not exclude) or (not has_asset_type and exclude):
-                asset_positions = [pos for pos in positions if pos["type"] == asset_type]
-                total_exposure = sum(pos.get("valuation", pos.get("amount", 0)) for pos in asset_positions)
+            if has_asset_type != exclude:
+                total_exposure = portfolio.totals.get(asset_type, 0)
                 
                 results.append({
                     "client": client,
@@ -281,6 +442,11 @@ class WealthManagementServer:
                                 "minimum": 1,
                                 "maximum": 100,
                                 "description": "Maximum number of clients to return (default: all)"
+                            },
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": ["clients", "summary"]},
+                                "description": "Response sections to include (default: all); metadata is always included"
                             }
                         },
                         "required": []
@@ -307,6 +473,16 @@ class WealthManagementServer:
                                 "minimum": 0,
                                 "maximum": 1,
                                 "description": "Minimum position weight threshold (optional)"
+                            },
+                            "include_alignment": {
+                                "type": "boolean",
+                                "default": False,
+                                "description": "Include the risk-profile alignment assessment in the summary (optional)"
+                            },
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": ["client_info", "positions", "summary"]},
+                                "description": "Response sections to include (default: all); client_id, client_name and metadata are always included"
                             }
                         },
                         "required": ["client_id"]
@@ -332,6 +508,16 @@ class WealthManagementServer:
                                 "type": "string", 
                                 "enum": ["equity", "bond", "all"],
                                 "description": "Filter by asset type (optional)"
+                            },
+                            "include_sector_breakdown": {
+                                "type": "boolean",
+                                "default": False,
+                                "description": "Include rating counts per sector in the summary (optional)"
+                            },
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": ["recommendations", "summary"]},
+                                "description": "Response sections to include (default: all); metadata is always included"
                             }
                         },
                         "required": []
@@ -344,322 +530,398 @@ class WealthManagementServer:
             """Handle tool calls with enhanced error handling and validation"""
             
             try:
-                if name == "get_clients":
-                    # Enhanced client retrieval with better filtering
-                    filter_by = arguments.get("filter_by", "all") if arguments else "all"
-                    sort_by = arguments.get("sort_by", "name") if arguments else "name"  
-                    limit = arguments.get("limit") if arguments else None
-                    
-                    clients = SAMPLE_CLIENTS.copy()
-                    
-                    # Apply filters
-                    if filter_by == "high_aum":
-                        clients = [c for c in clients if c["total_aum"] > 10000000]
-                    elif filter_by == "under_review":
-                        clients = [c for c in clients if c["status"] == "under_review"]
-                    elif filter_by == "active":
-                        clients = [c for c in clients if c["status"] == "active"]
-                    elif filter_by == "new_clients":
-                        # Clients onboarded in last 90 days
-                        cutoff_date = datetime.now() - timedelta(days=90)
-                        clients = [c for c in clients if datetime.strptime(c["onboarding_date"], "%Y-%m-%d") > cutoff_date]
-                        
-                    # Apply sorting
-                    if sort_by == "total_aum":
-                        clients.sort(key=lambda x: x["total_aum"], reverse=True)
-                    elif sort_by == "name":
-                        clients.sort(key=lambda x: x["name"])
-                    elif sort_by == "onboarding_date":
-                        clients.sort(key=lambda x: x["onboarding_date"], reverse=True)
-                    elif sort_by == "last_review":
-                        clients.sort(key=lambda x: x["last_review"], reverse=True)
-                        
-                    # Apply limit
-                    if limit and limit > 0:
-                        clients = clients[:limit]
-                        
-                    # Enhanced response with analytics
-                    total_aum = sum(c["total_aum"] for c in clients)
-                    risk_breakdown = {}
-                    for client in clients:
-                        risk = client["risk_profile"]
-                        if risk not in risk_breakdown:
-                            risk_breakdown[risk] = {"count": 0, "total_aum": 0}
-                        risk_breakdown[risk]["count"] += 1
-                        risk_breakdown[risk]["total_aum"] += client["total_aum"]
-                    
+                if name not in self._tool_renderers:
                     return [types.TextContent(
                         type="text",
-                        text=json.dumps({
-                            "clients": clients,
-                            "summary": {
-                                "total_count": len(clients),
-                                "total_aum": round(total_aum, 2),
-                                "average_aum": round(total_aum / len(clients), 2) if clients else 0,
-                                "risk_profile_breakdown": risk_breakdown
-                            },
-                            "metadata": {
-                                "filter_applied": filter_by,
-                                "sort_by": sort_by,
-                                "timestamp": datetime.now().isoformat(),
-                                "query_performance": "optimized"
-                            }
-                        }, indent=2)
+                        text=_dump({
+                            "error": f"Unknown tool: {name}",
+                            "error_code": "TOOL_NOT_FOUND",
+                            "available_tools": ["get_clients", "get_client_positions", "get_recommendations"]
+                        })
                     )]
                 
+                args = arguments if arguments else _EMPTY_ARGS
+                
+                # Optional projection onto response sections; None means all
+                fields = args.get("fields")
+                fields = frozenset(fields) if fields else None
+                
+                if name == "get_clients":
+                    # Enhanced client retrieval with better filtering
+                    filter_by = args.get("filter_by", "all")
+                    sort_by = args.get("sort_by", "name")
+                    limit = args.get("limit")
+                    
+                    # new_clients depends on the current date, so it is part of the cache key
+                    as_of = datetime.now().date() if filter_by == "new_clients" else None
+                    rendered = self._render_clients(filter_by, sort_by, limit, as_of, fields)
+                
                 elif name == "get_client_positions":
                     # Enhanced position retrieval with validation
-                    if not arguments or "client_id" not in arguments:
-                        return [types.TextContent(type="text", text=json.dumps({
+                    if "client_id" not in args:
+                        return [types.TextContent(type="text", text=_dump({
                             "error": "client_id is required",
                             "error_code": "MISSING_PARAMETER"
-                        }, indent=2))]
+                        }))]
                         
-                    client_id = arguments["client_id"]
+                    client_id = args["client_id"]
                     
                     # Validate client ID format
                     if not self.validate_client_id(client_id):
-                        return [types.TextContent(type="text", text=json.dumps({
+                        return [types.TextContent(type="text", text=_dump({
                             "error": f"Invalid client_id format: {client_id}. Expected format: BZ-XXXXX",
                             "error_code": "INVALID_FORMAT"
-                        }, indent=2))]
+                        }))]
                     
-                    asset_type = arguments.get("asset_type", "all")
-                    min_weight = arguments.get("min_weight", 0)
+                    asset_type = args.get("asset_type", "all")
+                    min_weight = args.get("min_weight", 0)
+                    include_alignment = bool(args.get("include_alignment", False))
                     
                     # Validate client exists
-                    client = next((c for c in SAMPLE_CLIENTS if c["client_id"] == client_id), None)
-                    if not client:
-                        return [types.TextContent(type="text", text=json.dumps({
+                    if client_id not in CLIENTS_BY_ID:
+                        return [types.TextContent(type="text", text=_dump({
                             "error": f"Client {client_id} not found",
                             "error_code": "CLIENT_NOT_FOUND",
                             "available_clients": [c["client_id"] for c in SAMPLE_CLIENTS[:5]]  # Show first 5 as examples
-                        }, indent=2))]
-                    
-                    # Get positions
-                    positions = self.get_client_positions(client_id)
-                    
-                    # Apply filters
-                    if asset_type != "all":
-                        positions = [p for p in positions if p["type"] == asset_type]
-                        
-                    if min_weight > 0:
-                        positions = [p for p in positions if p["weight"] >= min_weight * 100]
-                        
-                    # Calculate enhanced summary
-                    total_value = sum(pos["valuation"] if "valuation" in pos else pos["amount"] for pos in positions)
-                    
-                    # Asset breakdown with recommendations
-                    asset_breakdown = {}
-                    recommendation_summary = {"BUY": 0, "SELL": 0, "NEUTRAL": 0, "NO_RATING": 0}
-                    
-                    for pos in positions:
-                        asset_type_key = pos["type"]
-                        value = pos["valuation"] if "valuation" in pos else pos["amount"]
-                        
-                        if asset_type_key not in asset_breakdown:
-                            asset_breakdown[asset_type_key] = {"count": 0, "total_value": 0, "percentage": 0}
-                        asset_breakdown[asset_type_key]["count"] += 1
-                        asset_breakdown[asset_type_key]["total_value"] += value
-                        
-                        # Add recommendation info for securities
-                        if "isin" in pos:
-                            isin = pos["isin"]
-                            if isin in RECOMMENDATIONS_DATABASE:
-                                rating = RECOMMENDATIONS_DATABASE[isin]["rating"]
-                                pos["recommendation"] = RECOMMENDATIONS_DATABASE[isin]
-                                recommendation_summary[rating] += 1
-                            else:
-                                recommendation_summary["NO_RATING"] += 1
-                    
-                    # Calculate percentages
-                    for asset_type_key, data in asset_breakdown.items():
-                        data["total_value"] = round(data["total_value"], 2)
-                        data["percentage"] = round((data["total_value"] / total_value) * 100, 2)
-                    
-                    response = {
-                        "client_id": client_id,
-                        "client_name": client["name"],
-                        "client_info": {
-                            "risk_profile": client["risk_profile"],
-                            "total_aum": client["total_aum"],
-                            "last_review": client["last_review"],
-                            "status": client["status"]
-                        },
-                        "positions": positions,
-                        "summary": {
-                            "total_positions": len(positions),
-                            "total_value": round(total_value, 2),
-                            "asset_breakdown": asset_breakdown,
-                            "recommendation_summary": recommendation_summary,
-                            "alignment_with_risk_profile": self._assess_risk_alignment(client, positions)
-                        },
-                        "metadata": {
-                            "timestamp": datetime.now().isoformat(),
-                            "filters_applied": {
-                                "asset_type": asset_type,
-                                "min_weight": min_weight
-                            },
-                            "data_quality": "validated"
-                        }
-                    }
+                        }))]
                     
-                    return [types.TextContent(type="text", text=json.dumps(response, indent=2))]
+                    rendered = self._render_client_positions(client_id, asset_type, min_weight, include_alignment, fields)
                 
-                elif name == "get_recommendations":
+                else:
                     # Enhanced recommendation retrieval
-                    isins = arguments.get("isins", []) if arguments else []
-                    rating_filter = arguments.get("rating_filter", "all") if arguments else "all" 
-                    asset_type = arguments.get("asset_type", "all") if arguments else "all"
-                    
-                    recommendations = []
+                    isins = args.get("isins", [])
+                    rating_filter = args.get("rating_filter", "all")
+                    asset_type = args.get("asset_type", "all")
+                    include_sector_breakdown = bool(args.get("include_sector_breakdown", False))
                     
-                    # If no specific ISINs requested, get all available recommendations
-                    target_isins = isins if isins else list(RECOMMENDATIONS_DATABASE.keys())
-                    
-                    for isin in target_isins:
-                        if isin not in RECOMMENDATIONS_DATABASE:
-                            continue
-                            
-                        recommendation = RECOMMENDATIONS_DATABASE[isin].copy()
-                        security_info = SECURITIES_DATABASE.get(isin, {})
-                        
-                        # Apply asset type filter
-                        if asset_type != "all" and security_info.get("type") != asset_type:
-                            continue
-                            
-                        # Apply rating filter  
-                        if rating_filter != "all" and recommendation["rating"] != rating_filter:
-                            continue
-                            
-                        # Enhance with security information
-                        recommendation["isin"] = isin
-                        recommendation["security_name"] = security_info.get("name", "Unknown")
-                        recommendation["security_type"] = security_info.get("type", "unknown")
-                        recommendation["sector"] = security_info.get("sector", "N/A")
-                        
-                        # Add performance metrics
-                        current_price = recommendation.get("current_price", 0)
-                        target_price = recommendation.get("target_price", 0)
-                        if current_price > 0 and target_price > 0:
-                            recommendation["upside_potential"] = round(((target_price - current_price) / current_price) * 100, 2)
-                        
-                        recommendations.append(recommendation)
-                    
-                    # Sort by rating priority (BUY > NEUTRAL > SELL) then by upside potential
-                    rating_priority = {"BUY": 3, "NEUTRAL": 2, "SELL": 1}
-                    recommendations.sort(
-                        key=lambda x: (
-                            rating_priority.get(x["rating"], 0), 
-                            x.get("upside_potential", 0)
-                        ), 
-                        reverse=True
-                    )
-                    
-                    # Calculate enhanced summary statistics
-                    rating_counts = {"BUY": 0, "SELL": 0, "NEUTRAL": 0}
-                    sector_breakdown = {}
-                    avg_upside = 0
-                    upside_count = 0
-                    
-                    for rec in recommendations:
-                        rating_counts[rec["rating"]] += 1
-                        
-                        sector = rec.get("sector", "Unknown")
-                        if sector not in sector_breakdown:
-                            sector_breakdown[sector] = {"BUY": 0, "SELL": 0, "NEUTRAL": 0}
-                        sector_breakdown[sector][rec["rating"]] += 1
-                        
-                        if "upside_potential" in rec:
-                            avg_upside += rec["upside_potential"]
-                            upside_count += 1
-                    
-                    if upside_count > 0:
-                        avg_upside = round(avg_upside / upside_count, 2)
-                    
-                    response = {
-                        "recommendations": recommendations,
-                        "summary": {
-                            "total_recommendations": len(recommendations), 
-                            "rating_breakdown": rating_counts,
-                            "sector_breakdown": sector_breakdown,
-                            "avg_upside_potential": avg_upside,
-                            "filters_applied": {
-                                "specific_isins": len(arguments.get("isins", [])) > 0 if arguments else False,
-                                "rating_filter": rating_filter,
-                                "asset_type": asset_type
-                            }
-                        },
-                        "metadata": {
-                            "timestamp": datetime.now().isoformat(),
-                            "research_coverage": len(RECOMMENDATIONS_DATABASE),
-                            "data_freshness": "daily_updates"
-                        }
-                    }
-                    
-                    return [types.TextContent(type="text", text=json.dumps(response, indent=2))]
+                    rendered = self._render_recommendations(tuple(isins), rating_filter, asset_type, include_sector_breakdown, fields)
                 
-                else:
-                    return [types.TextContent(
-                        type="text",
-                        text=json.dumps({
-                            "error": f"Unknown tool: {name}",
-                            "error_code": "TOOL_NOT_FOUND",
-                            "available_tools": ["get_clients", "get_client_positions", "get_recommendations"]
-                        }, indent=2)
-                    )]
+                head, tail = rendered
+                return [types.TextContent(type="text", text=head + _now_iso() + tail)]
                     
             except Exception as e:
                 # Comprehensive error handling
-                return [types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "error": f"Internal server error: {str(e)}",
-                        "error_code": "INTERNAL_ERROR",
-                        "timestamp": datetime.now().isoformat(),
-                        "tool_name": name,
-                        "arguments": arguments
-                    }, indent=2)
-                )]
+                error = {
+                    "error": f"Internal server error: {str(e)}",
+                    "error_code": "INTERNAL_ERROR",
+                    "timestamp": _now_iso(),
+                    "tool_name": name,
+                    **_error_arguments(arguments)
+                }
+                try:
+                    text = _dump_compact(error)
+                except TypeError:
+                    # orjson rejects integers beyond 64 bits, which arguments may carry
+                    text = json.dumps(error)
+                return [types.TextContent(type="text", text=text)]
 
+    def invalidate_tool_cache(self, tool: Optional[str] = None):
+        """Drop cached responses for one tool, or for every tool when none is given"""
+        for name, render in self._tool_renderers.items():
+            if tool is None or tool == name:
+                render.cache_clear()
 
-    def _assess_risk_alignment(self, client: Dict[str, Any], positions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Assess how well the portfolio aligns with client risk profile"""
-        risk_profile = client["risk_profile"]
+    @property
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Response cache statistics per tool"""
+        stats = {}
+        for name, render in self._tool_renderers.items():
+            info = render.cache_info()
+            lookups = info.hits + info.misses
+            stats[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "size": info.currsize,
+                "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0
+            }
+        return stats
+
+    @staticmethod
+    def _wants(fields: Optional[FrozenSet[str]], section: str) -> bool:
+        """Whether a response section was requested (all are without fields)"""
+        return fields is None or section in fields
+
+    @staticmethod
+    def _split_at_timestamp(response: Dict[str, Any]) -> Tuple[str, str]:
+        """Serialize a response whose metadata timestamp is _TIMESTAMP_SLOT into
+        the text before and after it, so cached bodies get a fresh timestamp"""
+        head, _, tail = _dump(response).partition(_TIMESTAMP_SLOT_JSON)
+        return head, tail
+
+    def _render_clients(self, filter_by: str, sort_by: str, limit: Optional[int], as_of: Optional[date] = None,
+                        fields: Optional[FrozenSet[str]] = None) -> Tuple[str, str]:
+        """Build the get_clients response"""
+        # total_aum order is precomputed; filtering the presorted list keeps
+        # the same order sorting the filtered list would give
+        presorted = sort_by == "total_aum"
+        clients = CLIENTS_BY_AUM_DESC if presorted else SAMPLE_CLIENTS
         
-        # Calculate asset allocation
-        total_value = sum(pos["valuation"] if "valuation" in pos else pos["amount"] for pos in positions)
-        cash_pct = sum(pos["amount"] for pos in positions if pos["type"] == "cash") / total_value * 100
-        equity_pct = sum(pos["valuation"] for pos in positions if pos["type"] == "equity") / total_value * 100
-        bond_pct = sum(pos["valuation"] for pos in positions if pos["type"] == "bond") / total_value * 100
-        
-        # Define target allocations by risk profile
-        targets = {
-            "Conservative": {"cash": (15, 25), "bonds": (50, 65), "equities": (15, 30)},
-            "Moderate": {"cash": (5, 15), "bonds": (30, 45), "equities": (40, 65)},
-            "Aggressive": {"cash": (2, 8), "bonds": (10, 25), "equities": (65, 85)}
+        # Apply filters
+        if filter_by == "high_aum":
+            if presorted:
+                clients = clients[:len(clients) - bisect.bisect_right(CLIENT_AUMS_ASC, 10000000)]
+            else:
+                clients = [c for c in clients if c["total_aum"] > 10000000]
+        elif filter_by == "under_review":
+            clients = [c for c in clients if c["status"] == "under_review"]
+        elif filter_by == "active":
+            clients = [c for c in clients if c["status"] == "active"]
+        elif filter_by == "new_clients":
+            # Clients onboarded in last 90 days
+            cutoff_date = datetime.now() - timedelta(days=90)
+            clients = [c for c in clients if ONBOARDING_DATES[c["client_id"]] > cutoff_date]
+            
+        # Apply sorting and limit; a small limit takes a heap selection
+        # instead of sorting the whole list (same order, ties included)
+        limit = limit if limit and limit > 0 else None
+        order = None if presorted else CLIENT_SORT_ORDERS.get(sort_by)
+        if order is None:
+            clients = clients[:limit]
+        else:
+            key, reverse = order
+            if limit and limit < len(clients) // 2:
+                clients = (heapq.nlargest if reverse else heapq.nsmallest)(limit, clients, key=key)
+            else:
+                clients = sorted(clients, key=key, reverse=reverse)[:limit]
+            
+        response = {}
+        if self._wants(fields, "clients"):
+            response["clients"] = clients
+            
+        if self._wants(fields, "summary"):
+            # Enhanced response with analytics, in a single pass
+            total_aum = 0
+            risk_breakdown = defaultdict(lambda: {"count": 0, "total_aum": 0})
+            for client in clients:
+                aum = client["total_aum"]
+                total_aum += aum
+                breakdown = risk_breakdown[client["risk_profile"]]
+                breakdown["count"] += 1
+                breakdown["total_aum"] += aum
+            
+            response["summary"] = {
+                "total_count": len(clients),
+                "total_aum": round(total_aum, 2),
+                "average_aum": round(total_aum / len(clients), 2) if clients else 0,
+                "risk_profile_breakdown": risk_breakdown
+            }
+        
+        response["metadata"] = {
+            "filter_applied": filter_by,
+            "sort_by": sort_by,
+            "timestamp": _TIMESTAMP_SLOT,
+            "query_performance": "optimized"
         }
+        return self._split_at_timestamp(response)
+
+    def _render_client_positions(self, client_id: str, asset_type: str, min_weight: float, include_alignment: bool = False,
+                                 fields: Optional[FrozenSet[str]] = None) -> Tuple[str, str]:
+        """Build the get_client_positions response for a known client"""
+        client = CLIENTS_BY_ID[client_id]
         
-        target = targets.get(risk_profile, targets["Moderate"])
+        # Get positions
+        positions = self.get_client_positions(client_id)
         
-        # Check alignment
-        alignment_score = 0
-        issues = []
+        # Apply filters
+        if asset_type != "all":
+            positions = [p for p in positions if p["type"] == asset_type]
+            
+        if min_weight > 0:
+            positions = [p for p in positions if p["weight"] >= min_weight * 100]
+            
+        # Calculate enhanced summary
+        total_value = sum(pos["amount"] if (value := pos.get("valuation")) is None else value for pos in positions)
         
-        if target["cash"][0] <= cash_pct <= target["cash"][1]:
-            alignment_score += 33
-        else:
-            issues.append(f"Cash allocation {cash_pct:.1f}% outside target range {target['cash'][0]}-{target['cash'][1]}%")
+        # Asset breakdown with recommendations
+        asset_breakdown = defaultdict(lambda: {"count": 0, "total_value": 0, "percentage": 0})
+        recommendation_summary = {"BUY": 0, "SELL": 0, "NEUTRAL": 0, "NO_RATING": 0}
         
-        if target["bonds"][0] <= bond_pct <= target["bonds"][1]:
-            alignment_score += 33
+        for pos in positions:
+            value = pos.get("valuation")
+            if value is None:  # only cash rows carry an amount instead
+                value = pos["amount"]
+            
+            breakdown = asset_breakdown[pos["type"]]
+            breakdown["count"] += 1
+            breakdown["total_value"] += value
+            
+            # Add recommendation info for securities
+            if "isin" in pos:
+                isin = pos["isin"]
+                if isin in RECOMMENDATIONS_DATABASE:
+                    rating = RECOMMENDATIONS_DATABASE[isin]["rating"]
+                    pos["recommendation"] = RECOMMENDATIONS_DATABASE[isin]
+                    recommendation_summary[rating] += 1
+                else:
+                    recommendation_summary["NO_RATING"] += 1
+        
+        response = {
+            "client_id": client_id,
+            "client_name": client["name"]
+        }
+        if self._wants(fields, "client_info"):
+            response["client_info"] = {
+                "risk_profile": client["risk_profile"],
+                "total_aum": client["total_aum"],
+                "last_review": client["last_review"],
+                "status": client["status"]
+            }
+        if self._wants(fields, "positions"):
+            response["positions"] = positions
+        if self._wants(fields, "summary"):
+            # Calculate percentages
+            for asset_type_key, data in asset_breakdown.items():
+                data["total_value"] = round(data["total_value"], 2)
+                data["percentage"] = round((data["total_value"] / total_value) * 100, 2)
+            
+            response["summary"] = {
+                "total_positions": len(positions),
+                "total_value": round(total_value, 2),
+                "asset_breakdown": asset_breakdown,
+                "recommendation_summary": recommendation_summary
+            }
+            if include_alignment:
+                response["summary"]["alignment_with_risk_profile"] = self._assess_risk_alignment(client, positions)
+        
+        response["metadata"] = {
+            "timestamp": _TIMESTAMP_SLOT,
+            "filters_applied": {
+                "asset_type": asset_type,
+                "min_weight": min_weight
+            },
+            "data_quality": "validated"
+        }
+        return self._split_at_timestamp(response)
+
+    def _render_recommendations(self, isins: Tuple[str, ...], rating_filter: str, asset_type: str,
+                                include_sector_breakdown: bool = False,
+                                fields: Optional[FrozenSet[str]] = None) -> Tuple[str, str]:
+        """Build the get_recommendations response"""
+        recommendations = []
+        
+        # If no specific ISINs requested, get all available recommendations
+        # (otherwise walk the smallest prebuilt bucket matching the filters)
+        if isins:
+            target_isins = isins
         else:
-            issues.append(f"Bond allocation {bond_pct:.1f}% outside target range {target['bonds'][0]}-{target['bonds'][1]}%")
+            buckets = []
+            if rating_filter != "all":
+                buckets.append(RECOMMENDATIONS_BY_RATING.get(rating_filter, []))
+            if asset_type != "all":
+                buckets.append(RECOMMENDATIONS_BY_TYPE.get(asset_type, []))
+            target_isins = min(buckets, key=len) if buckets else list(RECOMMENDATIONS_DATABASE.keys())
         
-        if target["equities"][0] <= equity_pct <= target["equities"][1]:
-            alignment_score += 34
+        for isin in target_isins:
+            if isin not in RECOMMENDATIONS_DATABASE:
+                continue
+                
+            recommendation = RECOMMENDATIONS_DATABASE[isin].copy()
+            security_info = SECURITIES_DATABASE.get(isin, {})
+            
+            # Apply asset type filter
+            if asset_type != "all" and security_info.get("type") != asset_type:
+                continue
+                
+            # Apply rating filter  
+            if rating_filter != "all" and recommendation["rating"] != rating_filter:
+                continue
+                
+            # Enhance with security information
+            recommendation["isin"] = isin
+            recommendation["security_name"] = security_info.get("name", "Unknown")
+            recommendation["security_type"] = security_info.get("type", "unknown")
+            recommendation["sector"] = security_info.get("sector", "N/A")
+            
+            # Add performance metrics
+            current_price = recommendation.get("current_price", 0)
+            target_price = recommendation.get("target_price", 0)
+            if current_price > 0 and target_price > 0:
+                recommendation["upside_potential"] = round(((target_price - current_price) / current_price) * 100, 2)
+            
+            recommendations.append(recommendation)
+        
+        # Sort by rating priority (BUY > NEUTRAL > SELL) then by upside potential
+        rating_priority = {"BUY": 3, "NEUTRAL": 2, "SELL": 1}
+        recommendations.sort(
+            key=lambda x: (
+                rating_priority.get(x["rating"], 0), 
+                x.get("upside_potential", 0)
+            ), 
+            reverse=True
+        )
+        
+        response = {}
+        if self._wants(fields, "recommendations"):
+            response["recommendations"] = recommendations
+            
+        if self._wants(fields, "summary"):
+            # Calculate enhanced summary statistics
+            rating_counts = {"BUY": 0, "SELL": 0, "NEUTRAL": 0}
+            sector_breakdown = defaultdict(lambda: {"BUY": 0, "SELL": 0, "NEUTRAL": 0})
+            avg_upside = 0
+            upside_count = 0
+            
+            for rec in recommendations:
+                rating = rec["rating"]
+                rating_counts[rating] += 1
+                if include_sector_breakdown:
+                    sector_breakdown[rec.get("sector", "Unknown")][rating] += 1
+                
+                if "upside_potential" in rec:
+                    avg_upside += rec["upside_potential"]
+                    upside_count += 1
+            
+            if upside_count > 0:
+                avg_upside = round(avg_upside / upside_count, 2)
+            
+            summary = response["summary"] = {
+                "total_recommendations": len(recommendations), 
+                "rating_breakdown": rating_counts
+            }
+            if include_sector_breakdown:
+                summary["sector_breakdown"] = sector_breakdown
+            summary["avg_upside_potential"] = avg_upside
+            summary["filters_applied"] = {
+                "specific_isins": len(isins) > 0,
+                "rating_filter": rating_filter,
+                "asset_type": asset_type
+            }
+        
+        response["metadata"] = {
+            "timestamp": _TIMESTAMP_SLOT,
+            "research_coverage": len(RECOMMENDATIONS_DATABASE),
+            "data_freshness": "daily_updates"
+        }
+        return self._split_at_timestamp(response)
+
+    def _assess_risk_alignment(self, client: Dict[str, Any], positions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assess how well the portfolio aligns with client risk profile"""
+        risk_profile = client["risk_profile"]
+        
+        # Calculate asset allocation; one pass buckets the values by type, and
+        # sum() per bucket keeps the rounding of summing each type directly
+        values = []
+        values_by_type = defaultdict(list)
+        for pos in positions:
+            value = pos.get("valuation")
+            if value is None:  # only cash rows carry an amount instead
+                value = pos["amount"]
+            values.append(value)
+            values_by_type[pos["type"]].append(value)
+        total_value = sum(values)
+        if total_value:
+            cash_pct = sum(values_by_type["cash"]) / total_value * 100
+            equity_pct = sum(values_by_type["equity"]) / total_value * 100
+            bond_pct = sum(values_by_type["bond"]) / total_value * 100
         else:
-            issues.append(f"Equity allocation {equity_pct:.1f}% outside target range {target['equities'][0]}-{target['equities'][1]}%")
+            # An empty or zero-valued portfolio reads as 0% of everything
+            cash_pct = equity_pct = bond_pct = 0.0
+        
+        target = RISK_TARGETS.get(risk_profile, RISK_TARGETS["Moderate"])
+        align = _ALIGNERS.get(risk_profile, _ALIGNERS["Moderate"])
+        
+        # Check alignment
+        alignment_score, issues = align(cash_pct, bond_pct, equity_pct)
         
         return {
             "alignment_score": alignment_score,
@@ -677,8 +939,9 @@ class WealthManagementServer:
     async def run(self):
         logger.info("Starting Wealth Management MCP Server")
         try:
-            # Use stdio transport for MCP communication
-            async with stdio_server() as (read_stream, write_stream):
+            # Use stdio transport for MCP communication; responses to concurrent
+            # tool calls are written out together (see batched_stdio_server)
+            async with batched_stdio_server() as (read_stream, write_stream):
                 await self.server.run(
                     read_stream,
                     write_stream,
@@ -701,10 +964,6 @@ async def main():
     await server.run()
 
 
-if __name__ == "__main__":
-    asyncio.run(main())
-
-
 # Enhanced client data with more realistic attributes
 SAMPLE_CLIENTS = [
     {
@@ -759,6 +1018,27 @@ SAMPLE_CLIENTS = [
     }
 ]
 
+# Client lookup by ID
+CLIENTS_BY_ID: Dict[str, Dict[str, Any]] = {c["client_id"]: c for c in SAMPLE_CLIENTS}
+
+# Parsed onboarding dates by client ID; kept off the client dicts, which are
+# returned as-is in responses
+ONBOARDING_DATES: Dict[str, datetime] = {
+    c["client_id"]: datetime.strptime(c["onboarding_date"], "%Y-%m-%d") for c in SAMPLE_CLIENTS
+}
+
+# get_clients sort_by -> (sort key, descending); other values keep list order
+CLIENT_SORT_ORDERS = {
+    "total_aum": (itemgetter("total_aum"), True),
+    "name": (itemgetter("name"), False),
+    "onboarding_date": (itemgetter("onboarding_date"), True),
+    "last_review": (itemgetter("last_review"), True),
+}
+
+# Clients by descending AUM (ties in list order), and the AUMs ascending for bisect
+CLIENTS_BY_AUM_DESC = sorted(SAMPLE_CLIENTS, key=itemgetter("total_aum"), reverse=True)
+CLIENT_AUMS_ASC = sorted(c["total_aum"] for c in SAMPLE_CLIENTS)
+
 # Enhanced securities database with more metadata
 SECURITIES_DATABASE = {
     # Technology Equities
@@ -790,6 +1070,14 @@ SECURITIES_DATABASE = {
     "US717081103": {"name": "Pfizer Corporate Bond", "type": "bond", "maturity": "2033-03-15", "currency": "USD", "rating": "AA", "yield": 3.9}
 }
 
+# Securities grouped by asset type
+SECURITIES_BY_TYPE: Dict[str, Tuple[str, ...]] = {
+    asset_type: tuple(isin for isin, data in SECURITIES_DATABASE.items() if data["type"] == asset_type)
+    for asset_type in ("equity", "bond")
+}
+EQUITY_ISINS = SECURITIES_BY_TYPE["equity"]
+BOND_ISINS = SECURITIES_BY_TYPE["bond"]
+
 # Enhanced recommendations with more detailed analysis
 RECOMMENDATIONS_DATABASE = {
     # Technology stocks
@@ -896,3 +1184,36 @@ RECOMMENDATIONS_DATABASE = {
         "risk_factors": ["Drug pricing pressure"], "confidence": "Medium"
     }
 }
+
+# Recommended ISINs grouped by rating
+RECOMMENDATIONS_BY_RATING: Dict[str, List[str]] = {
+    rating: [isin for isin, rec in RECOMMENDATIONS_DATABASE.items() if rec["rating"] == rating]
+    for rating in ("BUY", "SELL", "NEUTRAL")
+}
+SELL_ISINS = frozenset(RECOMMENDATIONS_BY_RATING["SELL"])
+
+# Recommended ISINs grouped by security type
+RECOMMENDATIONS_BY_TYPE: Dict[str, List[str]] = {
+    asset_type: [isin for isin in RECOMMENDATIONS_DATABASE if SECURITIES_DATABASE.get(isin, {}).get("type") == asset_type]
+    for asset_type in SECURITIES_BY_TYPE
+}
+
+# Target allocation ranges (%) by risk profile
+RISK_TARGETS = {
+    "Conservative": {"cash": (15, 25), "bonds": (50, 65), "equities": (15, 30)},
+    "Moderate": {"cash": (5, 15), "bonds": (30, 45), "equities": (40, 65)},
+    "Aggressive": {"cash": (2, 8), "bonds": (10, 25), "equities": (65, 85)}
+}
+
+# Risk profile -> alignment scorer specialized on that profile's targets
+_ALIGNERS = {profile: _make_aligner(target) for profile, target in RISK_TARGETS.items()}
+
+
+if __name__ == "__main__":
+    # Optional libuv-based event loop (pip install uvloop), stock asyncio otherwise
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())